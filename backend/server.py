@@ -1,29 +1,47 @@
 from fastapi import FastAPI, APIRouter, File, UploadFile, HTTPException, Form
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson import Binary
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, HttpUrl
+from pydantic import BaseModel, Field, ConfigDict, HttpUrl, field_validator
 from typing import List, Optional
 import uuid
 from datetime import datetime, timezone
 import io
 from PIL import Image
-import requests
+import httpx
+import asyncio
 import numpy as np
 import base64
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 try:
-    from transformers import CLIPModel, CLIPProcessor
+    from transformers import CLIPModel
     import torch
+    from torchvision.transforms import v2
     CLIP_AVAILABLE = True
 except ImportError:
     CLIP_AVAILABLE = False
     print("CLIP not available - install transformers and torch")
 
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+try:
+    from usearch.index import Index
+    USEARCH_AVAILABLE = True
+except ImportError:
+    USEARCH_AVAILABLE = False
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -38,6 +56,7 @@ mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
 db_name = os.environ.get('DB_NAME', 'visual_product_matcher')
 client = AsyncIOMotorClient(mongo_url)
 db = client[db_name]
+cors_origins = [origin.strip() for origin in os.environ.get('CORS_ORIGINS', '*').split(',')]
 
 # Create the main app without a prefix
 app = FastAPI(title="Visual Product Matcher", description="Find visually similar products")
@@ -45,64 +64,212 @@ app = FastAPI(title="Visual Product Matcher", description="Find visually similar
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Compile (GPU) or trace (CPU) the CLIP image tower after loading: "true",
+# "false", or "auto" (GPU only, since tracing costs memory on the CPU tier)
+CLIP_COMPILE = os.environ.get('CLIP_COMPILE', 'auto').lower()
+
+# Shared async HTTP client for downloading images
+http_client = httpx.AsyncClient(timeout=10, http2=True, follow_redirects=True)
+
 # Upload directory
 UPLOAD_DIR = Path(ROOT_DIR) / "uploads"
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-# Initialize CLIP model with lazy loading to save memory
+# CLIP image embedder; the model loads in the startup hook, or on first use
+# if that failed
 class CLIPEmbedder:
     def __init__(self):
         if not CLIP_AVAILABLE:
             raise Exception("CLIP not available")
-        self.device = torch.device("cpu")  # Force CPU to save memory on Render free tier
+        # Render free tier has no GPU, so this resolves to CPU there
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model = None
-        self.processor = None
+        self.image_features = None
+        # Same preprocessing as CLIPProcessor, run as tensor ops
+        self.transform = v2.Compose([
+            v2.ToImage(),
+            v2.Resize(224, interpolation=v2.InterpolationMode.BICUBIC, antialias=True),
+            v2.CenterCrop(224),
+            v2.ToDtype(torch.float32, scale=True),
+            v2.Normalize(mean=[0.48145466, 0.4578275, 0.40821073],
+                         std=[0.26862954, 0.26130258, 0.27577711]),
+        ])
         self._loaded = False
+        # Pad multi-image batches to this size so a compiled graph sees
+        # only the warmed-up shapes (set once compilation succeeds on GPU)
+        self._pad_batch_to = None
+        # Guards against loading the model twice, which could exhaust memory
+        # on the Render host
+        self._load_lock = threading.Lock()
+        # Every load, warm-up and forward pass runs on this one thread:
+        # CUDA graph trees are thread-local, and one pass at a time suits
+        # the single torch thread on CPU
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clip-inference")
     
     def _load_model(self):
-        """Lazy load the model only when needed."""
+        """Load the model once; safe to call from any thread."""
         if self._loaded:
             return
         
-        try:
-            # Use CPU-only torch to reduce memory
-            import torch
-            torch.set_num_threads(1)  # Limit threads to save memory
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                # Use CPU-only torch to reduce memory
+                import torch
+                torch.set_num_threads(1)  # Limit threads to save memory
             
-            # Load model with low_cpu_mem_usage to reduce peak memory
-            self.model = CLIPModel.from_pretrained(
-                "openai/clip-vit-base-patch32",
-                torch_dtype=torch.float32,
-                low_cpu_mem_usage=True
-            ).to(self.device)
-            self.processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-            self.model.eval()
-            self._loaded = True
-            logging.info("CLIP model loaded successfully")
+                # Load model with low_cpu_mem_usage to reduce peak memory
+                self.model = CLIPModel.from_pretrained(
+                    "openai/clip-vit-base-patch32",
+                    torch_dtype=torch.float32,
+                    low_cpu_mem_usage=True
+                ).to(self.device)
+                if self.device.type == "cuda":
+                    # Half precision halves memory traffic and uses tensor cores
+                    self.model = self.model.half()
+                self.model.eval()
+                self.image_features = self.model.get_image_features
+                if CLIP_COMPILE == "true" or (CLIP_COMPILE == "auto" and self.device.type == "cuda"):
+                    self._compile_image_features()
+                self._loaded = True
+                logging.info("CLIP model loaded successfully")
+            except Exception as e:
+                logging.error(f"Failed to load CLIP model: {e}")
+                raise
+    
+    def _compile_image_features(self):
+        """Replace the image forward with a compiled version and warm it up."""
+        dummy = torch.zeros(1, 3, 224, 224, device=self.device, dtype=self.model.dtype)
+        try:
+            if self.device.type == "cuda":
+                compiled = torch.compile(self.model.get_image_features, mode="reduce-overhead", fullgraph=False)
+            else:
+                with torch.no_grad():
+                    compiled = torch.jit.trace(
+                        lambda pixel_values: self.model.get_image_features(pixel_values=pixel_values),
+                        dummy, check_trace=False
+                    )
+            # Warm up single queries and full batches so serving doesn't
+            # pay the compile or CUDA graph capture cost
+            with torch.inference_mode():
+                for batch_size in (1, EMBED_BATCH_SIZE):
+                    compiled(dummy.expand(batch_size, -1, -1, -1).contiguous())
+            self.image_features = compiled
+            if self.device.type == "cuda":
+                self._pad_batch_to = EMBED_BATCH_SIZE
+            logging.info("CLIP image encoder compiled")
         except Exception as e:
-            logging.error(f"Failed to load CLIP model: {e}")
-            raise
+            logging.warning(f"Failed to compile CLIP image encoder, using eager mode: {e}")
+    
+    async def load(self):
+        """Load (and compile) the model on the inference thread."""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._load_model)
     
-    def get_image_embedding(self, image):
+    async def embed_batch(self, images) -> np.ndarray:
+        """Embed images on the inference thread, queued behind earlier passes."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.get_image_embeddings_batch, images
+        )
+    
+    def close(self):
+        """Finish any running forward pass and stop the inference thread."""
+        self._executor.shutdown(wait=True)
+    
+    def get_image_embeddings_batch(self, images) -> np.ndarray:
+        """Embed a list of images in a single forward pass, returning (B, 512)."""
         if not self._loaded:
             self._load_model()
         
-        with torch.no_grad():
-            inputs = self.processor(images=image, return_tensors="pt")
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            outputs = self.model.get_image_features(**inputs)
-            embedding = torch.nn.functional.normalize(outputs, p=2, dim=1)
-        return embedding.cpu().numpy().flatten()
-
-# Global embedder instance (lazy loaded)
+        # On GPU the weights are already FP16 and the inputs are cast below, so
+        # no autocast: the forward runs under the same global state as the
+        # compile warm-up and reuses its graphs
+        use_fp16 = self.device.type == "cuda"
+        with torch.inference_mode():
+            pixel_values = torch.stack([self.transform(image) for image in images])
+            if self.device.type == "cuda":
+                pixel_values = pixel_values.pin_memory()
+            pixel_values = pixel_values.to(self.device, non_blocking=True)
+            if use_fp16:
+                pixel_values = pixel_values.half()
+            count = len(pixel_values)
+            if self._pad_batch_to and 1 < count < self._pad_batch_to:
+                padding = pixel_values.new_zeros((self._pad_batch_to - count, *pixel_values.shape[1:]))
+                pixel_values = torch.cat([pixel_values, padding])
+            outputs = self.image_features(pixel_values)[:count]
+            # Keep embeddings in FP32 for the similarity math downstream
+            embeddings = torch.nn.functional.normalize(outputs.float(), p=2, dim=1)
+        return embeddings.cpu().numpy()
+
+# Number of images embedded per forward pass
+EMBED_BATCH_SIZE = 16
+# How long a query waits for others to share its forward pass
+QUERY_BATCH_WAIT = 0.005
+
+class EmbeddingBatcher:
+    """Coalesce concurrent query embeddings into batched forward passes."""
+    def __init__(self, embedder, max_batch: int = EMBED_BATCH_SIZE, max_wait: float = QUERY_BATCH_WAIT):
+        self.embedder = embedder
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task = None
+    
+    async def submit(self, image) -> np.ndarray:
+        """Queue an image and wait for its embedding."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((image, future))
+        return await future
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Run the forward pass on the embedder's inference thread
+            try:
+                embeddings = await self.embedder.embed_batch([image for image, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), embedding in zip(batch, embeddings):
+                # Skip requests that were cancelled while waiting
+                if not future.done():
+                    future.set_result(embedding)
+
+# Global embedder instance (model loaded at startup)
 embedder = None
 if CLIP_AVAILABLE:
     try:
         embedder = CLIPEmbedder()
-        logging.info("CLIP embedder initialized (model will load on first use)")
+        logging.info("CLIP embedder initialized (model loads at startup)")
     except Exception as e:
         logging.error(f"Failed to initialize CLIP embedder: {e}")
 
+batcher = EmbeddingBatcher(embedder) if embedder else None
+
 # Define Models
 class Product(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -114,6 +281,14 @@ class Product(BaseModel):
     description: Optional[str] = None
     embedding: List[float] = []
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    
+    @field_validator('embedding', mode='before')
+    @classmethod
+    def parse_embedding(cls, value):
+        """Accept embeddings as ndarrays or packed float32 bytes."""
+        if isinstance(value, (bytes, np.ndarray)):
+            return decode_embedding(value).tolist()
+        return value
 
 class ProductCreate(BaseModel):
     name: str
@@ -136,28 +311,265 @@ class SearchRequest(BaseModel):
     min_similarity: float = 0.5
     category: Optional[str] = None
 
+class BatchOp(BaseModel):
+    method: str = "GET"
+    path: str
+    body: Optional[dict] = Field(default=None, alias="json")
+    data: Optional[dict] = None
+
+class BatchRequest(BaseModel):
+    ops: List[BatchOp]
+
 # Utility functions
-def load_image_from_url(url: str) -> Image.Image:
+def decode_embedding(value) -> np.ndarray:
+    """Decode a stored embedding (packed float32 bytes or legacy list)."""
+    if isinstance(value, bytes):
+        return np.frombuffer(value, dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+def product_document(product: Product, embedding: np.ndarray) -> dict:
+    """Build the MongoDB document for a product and its embedding."""
+    doc = product.model_dump(exclude={"embedding"})
+    doc['created_at'] = doc['created_at'].isoformat()
+    doc['embedding'] = Binary(np.asarray(embedding, dtype=np.float32).tobytes())
+    doc['embedding_i8'] = Binary(quantize_embedding(embedding).tobytes())
+    return doc
+
+# CLIP resizes the short side to 224 and center-crops, so anything
+# larger than this is wasted decode and resize work
+CLIP_IMAGE_SIZE = 224
+PREPROCESS_SHORT_SIDE = 256
+
+def decode_image(image_bytes: bytes) -> Image.Image:
+    """Decode image bytes to RGB, downscaled close to the CLIP input size."""
+    image = Image.open(io.BytesIO(image_bytes))
+    # Let libjpeg downscale in the DCT domain while decoding
+    image.draft('RGB', (CLIP_IMAGE_SIZE, CLIP_IMAGE_SIZE))
+    image = image.convert('RGB')
+    
+    scale = PREPROCESS_SHORT_SIDE / min(image.size)
+    if scale < 1:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.BILINEAR)
+    return image
+
+async def load_image_from_url(url: str) -> Image.Image:
     """Load image from URL."""
     try:
-        response = requests.get(url, timeout=10)
+        response = await http_client.get(url)
         response.raise_for_status()
-        image = Image.open(io.BytesIO(response.content)).convert('RGB')
-        return image
+        return decode_image(response.content)
     except Exception as e:
         raise ValueError(f"Failed to load image from URL: {str(e)}")
 
 def load_image_from_bytes(image_bytes: bytes) -> Image.Image:
     """Load image from bytes."""
     try:
-        image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
-        return image
+        return decode_image(image_bytes)
     except Exception as e:
         raise ValueError(f"Failed to load image: {str(e)}")
 
-def calculate_cosine_similarity(emb1: List[float], emb2: List[float]) -> float:
-    """Calculate cosine similarity between two embeddings."""
-    return float(np.dot(emb1, emb2))
+# Normalized embeddings are stored as int8 scaled by 127
+INT8_SCALE = 127
+
+def quantize_embedding(embedding: np.ndarray) -> np.ndarray:
+    """Quantize a normalized embedding to int8."""
+    return np.clip(np.round(embedding * INT8_SCALE), -INT8_SCALE, INT8_SCALE).astype(np.int8)
+
+def load_numba_kernel():
+    """Build the Numba int8 scoring kernel, or return None without Numba."""
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+    
+    @njit(parallel=True, fastmath=True)
+    def int8_dot_scores(matrix, query, out):
+        """Int8 dot product of every matrix row with the query, accumulated in int32."""
+        for i in prange(matrix.shape[0]):
+            acc = np.int32(0)
+            for j in range(matrix.shape[1]):
+                acc += np.int32(matrix[i, j]) * np.int32(query[j])
+            out[i] = acc
+    
+    return int8_dot_scores
+
+# Numba is an optional dependency (not in requirements.txt), imported only
+# when SimSIMD is missing so it costs nothing on hosts that never use it
+_int8_dot_scores = None if SIMSIMD_AVAILABLE else load_numba_kernel()
+
+def warm_up_kernels():
+    """Compile the Numba fallback kernel so the first search doesn't pay for it."""
+    if _int8_dot_scores is not None and not SIMSIMD_AVAILABLE:
+        _int8_dot_scores(np.zeros((1, EMBEDDING_DIM), dtype=np.int8), np.zeros(EMBEDDING_DIM, dtype=np.int8),
+                         np.empty(1, dtype=np.float32))
+
+def similarity_scores(matrix: np.ndarray, query: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Score every row of an int8 embedding matrix against an int8 query.
+    
+    Scores are written to `out` (float32, one per row) when it is given.
+    """
+    # A float or wider int operand would silently upcast the whole scan
+    assert matrix.dtype == np.int8 and query.dtype == np.int8
+    if out is None:
+        out = np.empty(len(matrix), dtype=np.float32)
+    if SIMSIMD_AVAILABLE:
+        simsimd.cdist(query, matrix, metric="dot", out=out.reshape(1, -1))
+    elif _int8_dot_scores is not None:
+        _int8_dot_scores(matrix, query, out)
+    else:
+        out[:] = matrix.astype(np.int32) @ query.astype(np.int32)
+    out *= np.float32(1.0 / (INT8_SCALE * INT8_SCALE))
+    return out
+
+def binarize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """Pack the sign of each dimension into bits (512 dims -> 64 bytes)."""
+    return np.packbits(embeddings > 0, axis=-1)
+
+def hamming_distances(bits: np.ndarray, query_bits: np.ndarray) -> np.ndarray:
+    """Hamming distance between every row of a packed bit matrix and a query."""
+    if SIMSIMD_AVAILABLE:
+        return np.asarray(simsimd.cdist(query_bits, bits, metric="hamming", dtype="bin8"))[0]
+    return np.bitwise_count(bits ^ query_bits).sum(axis=1)
+
+# In-memory embedding corpus (loaded at startup, appended on insert)
+EMBEDDING_DIM = 512
+RESULT_FIELDS = ("id", "name", "category", "image_url", "price", "description")
+# Only the fields needed for ranking and results are read into the corpus
+RESULT_PROJECTION = {"_id": 0, **{field: 1 for field in RESULT_FIELDS}}
+
+# Candidates shortlisted per requested result before exact rescoring
+SHORTLIST_OVERSAMPLE = 4
+
+EMB_MATRIX: Optional[np.ndarray] = None
+# HNSW index over the int8 rows, keyed by row number in EMB_MATRIX
+EMB_INDEX = None
+EMB_BITS: np.ndarray = np.empty((0, EMBEDDING_DIM // 8), dtype=np.uint8)
+EMB_META: List[dict] = []
+EMB_CATEGORIES: np.ndarray = np.empty(0, dtype=object)
+# Reusable per-query score buffer, one slot per row
+EMB_SCORES: np.ndarray = np.empty(0, dtype=np.float32)
+EMB_IDS: set = set()
+EMB_LOCK = asyncio.Lock()
+
+def build_ann_index(matrix: np.ndarray):
+    """Build a USearch HNSW index over the int8 embedding matrix."""
+    index = Index(ndim=EMBEDDING_DIM, metric='cos', dtype='i8',
+                  connectivity=16, expansion_add=64, expansion_search=64)
+    if len(matrix):
+        index.add(np.arange(len(matrix)), matrix)
+    return index
+
+def _product_meta(product: dict) -> dict:
+    """Extract the fields returned with each search result."""
+    return {field: product.get(field) for field in RESULT_FIELDS}
+
+async def load_embedding_corpus():
+    """Load all product embeddings into a contiguous int8 matrix.
+    
+    Must be called with EMB_LOCK held.
+    """
+    global EMB_MATRIX, EMB_INDEX, EMB_BITS, EMB_META, EMB_CATEGORIES, EMB_SCORES, EMB_IDS
+    products = await db.products.find(
+        {"embedding_i8": {"$exists": True}},
+        {**RESULT_PROJECTION, "embedding_i8": 1}
+    ).to_list(None)
+    
+    # Products stored before int8 quantization only have the float embedding
+    legacy = await db.products.find(
+        {"embedding_i8": {"$exists": False}},
+        {**RESULT_PROJECTION, "embedding": 1}
+    ).to_list(None)
+    legacy = [p for p in legacy if p.get('embedding')]
+    
+    # Copy each row straight into a preallocated matrix
+    matrix = np.empty((len(products) + len(legacy), EMBEDDING_DIM), dtype=np.int8)
+    for row, p in enumerate(products):
+        matrix[row] = np.frombuffer(p['embedding_i8'], dtype=np.int8)
+    for row, p in enumerate(legacy, start=len(products)):
+        matrix[row] = quantize_embedding(decode_embedding(p['embedding']))
+    products += legacy
+    
+    EMB_MATRIX = matrix
+    EMB_INDEX = build_ann_index(EMB_MATRIX) if USEARCH_AVAILABLE else None
+    EMB_BITS = binarize_embeddings(EMB_MATRIX)
+    EMB_META = [_product_meta(p) for p in products]
+    EMB_CATEGORIES = np.array([p['category'] for p in products], dtype=object)
+    EMB_SCORES = np.empty(len(EMB_MATRIX), dtype=np.float32)
+    EMB_IDS = {p['id'] for p in products}
+    logging.info(f"Loaded {len(EMB_META)} product embeddings into memory")
+
+async def ensure_embedding_corpus():
+    """Load the embedding corpus if it has not been loaded yet."""
+    if EMB_MATRIX is None:
+        async with EMB_LOCK:
+            if EMB_MATRIX is None:
+                await load_embedding_corpus()
+
+async def add_to_embedding_corpus(product: dict):
+    """Append a newly stored product document to the in-memory corpus."""
+    global EMB_MATRIX, EMB_BITS, EMB_CATEGORIES, EMB_SCORES
+    async with EMB_LOCK:
+        # Not loaded yet, or a concurrent load already picked it up from the database
+        if EMB_MATRIX is None or product['id'] in EMB_IDS:
+            return
+        row = np.frombuffer(product['embedding_i8'], dtype=np.int8)[None, :]
+        if EMB_INDEX is not None:
+            EMB_INDEX.add(len(EMB_MATRIX), row[0])
+        EMB_MATRIX = np.concatenate([EMB_MATRIX, row], axis=0)
+        EMB_BITS = np.concatenate([EMB_BITS, binarize_embeddings(row)], axis=0)
+        EMB_META.append(_product_meta(product))
+        EMB_CATEGORIES = np.append(EMB_CATEGORIES, np.array([product['category']], dtype=object))
+        EMB_SCORES = np.empty(len(EMB_MATRIX), dtype=np.float32)
+        EMB_IDS.add(product['id'])
+
+async def rank_products(query_embedding: np.ndarray, limit: int, min_similarity: float,
+                        category: Optional[str] = None) -> List[dict]:
+    """Rank the corpus against a query embedding and return the top matches."""
+    await ensure_embedding_corpus()
+    # No awaits below, so the corpus cannot change while it is being ranked
+    if limit <= 0 or not EMB_META:
+        return []
+    
+    query_i8 = quantize_embedding(query_embedding)
+    # None selects every row, which is scanned in place without gathering
+    candidates = np.flatnonzero(EMB_CATEGORIES == category) if category else None
+    pool_size = len(EMB_META) if candidates is None else len(candidates)
+    
+    shortlist_size = limit * SHORTLIST_OVERSAMPLE
+    if pool_size > shortlist_size:
+        if EMB_INDEX is not None and candidates is None:
+            # Approximate nearest neighbours from the HNSW graph
+            candidates = EMB_INDEX.search(query_i8, shortlist_size).keys.astype(np.intp)
+        else:
+            # Shortlist by Hamming distance on sign bits
+            bits = EMB_BITS if candidates is None else EMB_BITS[candidates]
+            distances = hamming_distances(bits, binarize_embeddings(query_embedding))
+            shortlist = np.argpartition(distances, shortlist_size - 1)[:shortlist_size]
+            candidates = shortlist if candidates is None else candidates[shortlist]
+    
+    if candidates is None:
+        candidates, matrix = np.arange(len(EMB_META)), EMB_MATRIX
+    else:
+        matrix = EMB_MATRIX[candidates]
+    if not len(candidates):
+        return []
+    
+    # Rescore the shortlist exactly with the int8 embeddings
+    scores = similarity_scores(matrix, query_i8, out=EMB_SCORES[:len(candidates)])
+    keep = scores >= min_similarity
+    candidates, scores = candidates[keep], scores[keep]
+    
+    # Select the top-k without sorting the whole corpus
+    if len(candidates) > limit:
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        candidates, scores = candidates[top], scores[top]
+    order = np.argsort(-scores, kind="stable")
+    
+    return [
+        {**EMB_META[i], "similarity_score": float(score)}
+        for i, score in zip(candidates[order], scores[order])
+    ]
 
 # Routes
 @api_router.get("/")
@@ -177,27 +589,35 @@ async def create_product(product: ProductCreate):
     
     try:
         # Load image and generate embedding
-        image = load_image_from_url(product.image_url)
-        embedding = embedder.get_image_embedding(image)
+        image = await load_image_from_url(product.image_url)
+        embedding = await batcher.submit(image)
         
         # Create product document
         product_dict = product.model_dump()
-        product_obj = Product(**product_dict, embedding=embedding.tolist())
+        product_obj = Product(**product_dict, embedding=embedding)
         
         # Store in database
-        doc = product_obj.model_dump()
-        doc['created_at'] = doc['created_at'].isoformat()
-        
+        doc = product_document(product_obj, embedding)
         await db.products.insert_one(doc)
+        await add_to_embedding_corpus(doc)
         return product_obj
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating product: {str(e)}")
 
 @api_router.get("/products", response_model=List[Product])
-async def get_products():
-    """Get all products."""
-    products = await db.products.find({}, {"_id": 0}).to_list(1000)
+async def get_products(fields: Optional[str] = None):
+    """Get all products, optionally projected to comma-separated `fields`."""
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = set(requested) - set(RESULT_FIELDS)
+        if unknown or not requested:
+            raise HTTPException(status_code=400, detail=f"fields must be drawn from {', '.join(RESULT_FIELDS)}")
+        # Partial documents don't match Product, so skip response validation
+        projection = {"_id": 0, **{field: 1 for field in requested}}
+        return JSONResponse(content=await db.products.find({}, projection).to_list(1000))
+    
+    products = await db.products.find({}, {"_id": 0, "embedding_i8": 0}).to_list(1000)
     for product in products:
         if isinstance(product['created_at'], str):
             product['created_at'] = datetime.fromisoformat(product['created_at'])
@@ -224,34 +644,12 @@ async def search_by_upload(
         # Read and process image
         file_content = await file.read()
         image = load_image_from_bytes(file_content)
-        query_embedding = embedder.get_image_embedding(image)
-        
-        # Search in database
-        filter_query = {} if not category else {"category": category}
-        products = await db.products.find(filter_query, {"_id": 0}).to_list(1000)
-        
-        # Calculate similarities
-        results = []
-        for product in products:
-            if product.get('embedding'):
-                similarity = calculate_cosine_similarity(
-                    query_embedding.tolist(),
-                    product['embedding']
-                )
-                if similarity >= min_similarity:
-                    results.append({
-                        "id": product['id'],
-                        "name": product['name'],
-                        "category": product['category'],
-                        "image_url": product['image_url'],
-                        "price": product.get('price'),
-                        "description": product.get('description'),
-                        "similarity_score": similarity
-                    })
+        query_embedding = await batcher.submit(image)
         
-        # Sort by similarity
-        results.sort(key=lambda x: x['similarity_score'], reverse=True)
-        return results[:limit]
+        # Rank against the in-memory embedding corpus; results already match
+        # SimilarProduct, so return them without per-item model validation
+        results = await rank_products(query_embedding, limit, min_similarity, category)
+        return JSONResponse(content=results)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching: {str(e)}")
@@ -266,42 +664,103 @@ async def search_by_url(url: str = Form(...), limit: int = Form(10),
     
     try:
         # Load image from URL
-        image = load_image_from_url(url)
-        query_embedding = embedder.get_image_embedding(image)
+        image = await load_image_from_url(url)
+        query_embedding = await batcher.submit(image)
         
-        # Search in database
-        filter_query = {} if not category else {"category": category}
-        products = await db.products.find(filter_query, {"_id": 0}).to_list(1000)
-        
-        # Calculate similarities
-        results = []
-        for product in products:
-            if product.get('embedding'):
-                similarity = calculate_cosine_similarity(
-                    query_embedding.tolist(),
-                    product['embedding']
-                )
-                if similarity >= min_similarity:
-                    results.append({
-                        "id": product['id'],
-                        "name": product['name'],
-                        "category": product['category'],
-                        "image_url": product['image_url'],
-                        "price": product.get('price'),
-                        "description": product.get('description'),
-                        "similarity_score": similarity
-                    })
-        
-        # Sort by similarity
-        results.sort(key=lambda x: x['similarity_score'], reverse=True)
-        return results[:limit]
+        # Rank against the in-memory embedding corpus; results already match
+        # SimilarProduct, so return them without per-item model validation
+        results = await rank_products(query_embedding, limit, min_similarity, category)
+        return JSONResponse(content=results)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching: {str(e)}")
 
+# Streamed seeds outlive their request; hold references until they finish
+SEED_TASKS = set()
+
+async def seed_sample_products(sample_products: List[dict], progress: Optional[asyncio.Queue] = None) -> dict:
+    """Embed and insert sample products, reporting {"seeded": k} after each insert."""
+    inserted = 0
+    failed = 0
+    
+    # Download all images concurrently so embeddings can be computed in batches
+    images = await asyncio.gather(
+        *[load_image_from_url(p['image_url']) for p in sample_products],
+        return_exceptions=True
+    )
+    loaded = []
+    for product_data, image in zip(sample_products, images):
+        if isinstance(image, Exception):
+            logging.error(f"Failed to add product {product_data['name']}: {image}")
+            failed += 1
+        else:
+            loaded.append((product_data, image))
+    
+    for start in range(0, len(loaded), EMBED_BATCH_SIZE):
+        batch = loaded[start:start + EMBED_BATCH_SIZE]
+        try:
+            # Queue behind search batches on the inference thread so other
+            # requests keep flowing
+            embeddings = await embedder.embed_batch([image for _, image in batch])
+        except Exception as e:
+            logging.error(f"Failed to embed batch of {len(batch)} products: {e}")
+            failed += len(batch)
+            continue
+        
+        for (product_data, _), embedding in zip(batch, embeddings):
+            try:
+                # Create product
+                product = Product(
+                    name=product_data['name'],
+                    category=product_data['category'],
+                    image_url=product_data['image_url'],
+                    price=product_data['price'],
+                )
+                
+                doc = product_document(product, embedding)
+                await db.products.insert_one(doc)
+                await add_to_embedding_corpus(doc)
+                inserted += 1
+                if progress:
+                    progress.put_nowait({"seeded": inserted})
+                
+            except Exception as e:
+                logging.error(f"Failed to add product {product_data['name']}: {e}")
+                failed += 1
+    
+    return {
+        "message": f"Seeded {inserted} products successfully",
+        "inserted": inserted,
+        "failed": failed
+    }
+
+async def stream_seed_progress(sample_products: List[dict]):
+    """Seed in a background task and yield its progress as NDJSON lines."""
+    progress = asyncio.Queue()
+    
+    async def run():
+        try:
+            progress.put_nowait(await seed_sample_products(sample_products, progress))
+        except Exception as e:
+            progress.put_nowait({"error": f"Error seeding: {str(e)}"})
+    
+    # Seeding continues if the client disconnects after the first update
+    task = asyncio.create_task(run())
+    SEED_TASKS.add(task)
+    task.add_done_callback(SEED_TASKS.discard)
+    while True:
+        update = await progress.get()
+        yield json.dumps(update) + "\n"
+        if "inserted" in update or "error" in update:
+            break
+
 @api_router.get("/seed-products")
-async def seed_products():
-    """Seed database with sample products."""
+async def seed_products(stream: bool = False):
+    """Seed database with sample products.
+    
+    With stream=true, progress is sent as NDJSON ({"seeded": k} per product,
+    then the summary) instead of a single reply once seeding finishes.
+    """
     if not embedder:
         raise HTTPException(status_code=503, detail="CLIP model not available")
     
@@ -392,50 +851,55 @@ async def seed_products():
         {"name": "Hair Dryer Professional", "category": "Beauty", "price": 149, "image_url": "https://images.unsplash.com/photo-1522338242992-e1a54906a8da?w=500"},
     ]
     
-    inserted = 0
-    failed = 0
+    if stream:
+        return StreamingResponse(stream_seed_progress(sample_products), media_type="application/x-ndjson")
+    return await seed_sample_products(sample_products)
+
+# Cap sub-requests per /batch call
+MAX_BATCH_OPS = 20
+# Only these (method, path) pairs may be batched; this also rules out
+# nesting /batch and fanning out seeding
+BATCH_ALLOWED_OPS = {("POST", "/products"), ("POST", "/search/url")}
+
+@api_router.post("/batch")
+async def batch(request: BatchRequest):
+    """Run independent API sub-requests concurrently in one round trip."""
+    if len(request.ops) > MAX_BATCH_OPS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_OPS} ops per batch")
+    # Match on the parsed path so query strings and encoding can't dodge the check
+    paths = []
+    for op in request.ops:
+        url = httpx.URL(op.path)
+        if url.host or (op.method.upper(), url.path) not in BATCH_ALLOWED_OPS:
+            allowed = ", ".join(f"{method} {path}" for method, path in sorted(BATCH_ALLOWED_OPS))
+            raise HTTPException(status_code=400, detail=f"Batch ops must be one of: {allowed}")
+        paths.append(url.path)
     
-    for product_data in sample_products:
+    async def dispatch(op: BatchOp, path: str) -> dict:
         try:
-            # Load image and generate embedding
-            image = load_image_from_url(product_data['image_url'])
-            embedding = embedder.get_image_embedding(image)
-            
-            # Create product
-            product = Product(
-                name=product_data['name'],
-                category=product_data['category'],
-                image_url=product_data['image_url'],
-                price=product_data['price'],
-                embedding=embedding.tolist()
-            )
-            
-            doc = product.model_dump()
-            doc['created_at'] = doc['created_at'].isoformat()
-            await db.products.insert_one(doc)
-            inserted += 1
-            
+            response = await batch_client.request(op.method, path, json=op.body, data=op.data)
         except Exception as e:
-            logging.error(f"Failed to add product {product_data['name']}: {e}")
-            failed += 1
+            return {"status": 500, "body": {"detail": f"Error in batch op: {str(e)}"}}
+        is_json = response.headers.get("content-type", "").startswith("application/json")
+        return {"status": response.status_code, "body": response.json() if is_json else response.text}
     
-    return {
-        "message": f"Seeded {inserted} products successfully",
-        "inserted": inserted,
-        "failed": failed
-    }
-
-# Include the router in the main app
-app.include_router(api_router)
+    # Sub-requests go straight to the ASGI app, skipping the network
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://batch/api") as batch_client:
+        results = await asyncio.gather(*(dispatch(op, path) for op, path in zip(request.ops, paths)))
+    return {"results": results}
 
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+    allow_origins=cors_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Include the router in the main app
+app.include_router(api_router)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -443,13 +907,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def load_corpus_on_startup():
+    warm_up_kernels()
+    if embedder:
+        try:
+            # Load, compile and warm up CLIP before serving rather than in
+            # the first request
+            await embedder.load()
+        except Exception as e:
+            # The first embedding request retries the load
+            logging.error(f"Failed to load CLIP model at startup: {e}")
+    try:
+        await ensure_embedding_corpus()
+    except Exception as e:
+        # The first search retries the load
+        logging.error(f"Failed to load embedding corpus: {e}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
+    await http_client.aclose()
+    if batcher:
+        await batcher.stop()
+    if embedder:
+        embedder.close()
     # Clear model from memory on shutdown
     if embedder and embedder._loaded:
         del embedder.model
-        del embedder.processor
+        del embedder.image_features
         import gc
         gc.collect()
         logging.info("CLIP model unloaded from memory")
\ No newline at end of file
@@ -1,265 +1,508 @@
-import requests
+import asyncio
+import base64
+import collections
+import functools
+import httpx
+import logging
 import sys
 import json
 import os
+import socket
+import time
 from datetime import datetime
 from pathlib import Path
+from tenacity import (retry, retry_if_exception_type, retry_if_result,
+                      stop_after_attempt, wait_exponential_jitter)
+
+# Plain-message output on stdout, configured once per process
+logger = logging.getLogger("backend_test")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Resolve each host once per run; asyncio's resolver (and so httpx)
+# looks up socket.getaddrinfo at call time
+_getaddrinfo = socket.getaddrinfo
+_dns_cache = {}
+
+def _cached_getaddrinfo(host, port, *args, **kwargs):
+    key = (host, port, args, tuple(sorted(kwargs.items())))
+    if key not in _dns_cache:
+        _dns_cache[key] = _getaddrinfo(host, port, *args, **kwargs)
+    return _dns_cache[key]
+
+def install_dns_cache():
+    """Route socket.getaddrinfo through the per-run cache.
+    
+    Called from main() only, so importing this module (e.g. during pytest
+    collection) leaves the process resolver untouched.
+    """
+    socket.getaddrinfo = _cached_getaddrinfo
+
+# 100x100 red PNG upload fixture, precomputed with
+# Image.new('RGB', (100, 100), color='red').save(buf, format='PNG')
+_PNG_B64 = (
+    b"iVBORw0KGgoAAAANSUhEUgAAAGQAAABkCAIAAAD/gAIDAAAA5klEQVR4nO3QQQkAIADAQLV/Z63gXiLcJRibe3BrvQ74iVmB"
+    b"WYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmB"
+    b"WYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmB"
+    b"WYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWYFZgVmBWcEBil4Bx/GEGnoAAAAASUVORK5CYII="
+)
+UPLOAD_PNG = base64.b64decode(_PNG_B64)
+
+TEST_IMAGE_URL = "https://images.unsplash.com/photo-1542291026-7eec264c27ff?w=500"
+
+# Test name -> (method, path, request kwargs), built once at import.
+# Entries sent through /batch carry only json/data kwargs.
+TESTS = {
+    "API Health Check": ("GET", "/", {"timeout": 10}),
+    # Only the product count matters, so skip the full documents and embeddings
+    "Get Products (Empty DB)": ("GET", "/products", {"params": {"fields": "id"}, "timeout": 10}),
+    # Streams NDJSON progress; the read timeout applies per line
+    "Seed Products": ("GET", "/seed-products", {"params": {"stream": "true"}, "timeout": 60}),
+    "Get Products (After Seed)": ("GET", "/products", {"params": {"fields": "id"}, "timeout": 10}),
+    "Get Categories": ("GET", "/products/categories", {"timeout": 10}),
+    "Create Product": ("POST", "/products", {"json": {
+        "name": "Test Product",
+        "category": "Test",
+        "image_url": TEST_IMAGE_URL,
+        "price": 99.99,
+        "description": "Test product for API testing"
+    }}),
+    "Search by URL": ("POST", "/search/url", {"data": {
+        "url": TEST_IMAGE_URL,
+        "limit": 5,
+        "min_similarity": 0.3
+    }}),
+    "Search by Upload": ("POST", "/search/upload", {
+        "data": {
+            "limit": 5,
+            "min_similarity": 0.1  # Lower threshold for test
+        },
+        "files": {"file": ("test.png", UPLOAD_PNG, "image/png")},
+    }),
+}
+
+# GET paths whose responses may be served from the tester's cache
+CACHED_PATHS = {"/products", "/products/categories"}
+
+# Tests read as NDJSON progress streams rather than single replies
+STREAMED_TESTS = {"Seed Products"}
+
+# Tests whose requests write data, so a retry after a timeout or 5xx
+# could apply the write twice; these are sent once
+WRITE_TESTS = {"Seed Products", "Create Product"}
+
+# Records that the target DB was seen seeded, so repeat runs within the
+# TTL skip the empty-DB check and seeding
+SEED_CACHE_PATH = Path(".vpm_test_cache.json")
+SEED_CACHE_TTL = 3600
+
+def expect_ok(status, body=None):
+    """Fail the current test unless the response status is 200"""
+    if status != 200:
+        raise AssertionError(f"Status: {status}" + (f", Response: {body}" if body is not None else ""))
+
+def test_case(name, default=None):
+    """Send the TESTS request for `name` and check it with the decorated coroutine.
+    
+    The check takes (status, body) and returns (value, details). A result
+    already fetched through /batch may be passed in instead of sending.
+    On any exception the failure is logged and `default` is returned.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(self, result=None):
+            start = time.perf_counter()
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                status, body = result if result is not None else await self._send(name)
+                value, details = await fn(self, status, body)
+                await self.log_test(name, True, details)
+                return value
+            except Exception as e:
+                await self.log_test(name, False, str(e))
+                return default
+            finally:
+                self.timings[name] = time.perf_counter() - start
+        return wrapper
+    return decorator
+
+# A decorator, not a test; keep pytest from collecting it
+test_case.__test__ = False
 
 class VisualProductMatcherTester:
     def __init__(self):
         # Use the public endpoint from frontend .env
         self.base_url = "https://similarpick.preview.emergentagent.com/api"
-        self.tests_run = 0
-        self.tests_passed = 0
-        self.failed_tests = []
-        self.passed_tests = []
+        # Updated only under self._lock, since tests log concurrently
+        self._counts = {'run': 0, 'passed': 0}
+        self.failed_tests = collections.deque()
+        self.passed_tests = collections.deque()
+        # test name -> elapsed seconds
+        self.timings = {}
+        # One HTTP/2 connection multiplexes every concurrent test request
+        self.client = httpx.AsyncClient(
+            http2=True,
+            base_url=self.base_url,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+        )
+        self._lock = asyncio.Lock()
+        # (path, params) -> (fetched_at, json_body) for idempotent GETs
+        self._cache = {}
+        self._skip_seed = self._seed_cache_fresh()
+        # Drains a streamed seed after its test has passed
+        self._seed_drain = None
 
-    def log_test(self, name, success, details=""):
-        """Log test result"""
-        self.tests_run += 1
-        if success:
-            self.tests_passed += 1
-            self.passed_tests.append(name)
-            print(f"✅ {name} - PASSED")
-        else:
-            self.failed_tests.append({"test": name, "details": details})
-            print(f"❌ {name} - FAILED: {details}")
-
-    def test_api_health(self):
-        """Test basic API health"""
+    def _seed_cache_fresh(self):
+        """Whether SEED_CACHE_PATH says this base_url was seeded within the TTL"""
         try:
-            response = requests.get(f"{self.base_url}/", timeout=10)
-            success = response.status_code == 200
-            if success:
-                data = response.json()
-                clip_available = data.get('clip_available', False)
-                self.log_test("API Health Check", success, f"CLIP Available: {clip_available}")
-                return clip_available
-            else:
-                self.log_test("API Health Check", False, f"Status: {response.status_code}")
-                return False
-        except Exception as e:
-            self.log_test("API Health Check", False, str(e))
+            with open(SEED_CACHE_PATH) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
             return False
+        return (cached.get("base_url") == self.base_url
+                and cached.get("count", 0) > 0
+                and cached.get("seeded_at", 0) > time.time() - SEED_CACHE_TTL)
 
-    def test_get_products_empty(self):
-        """Test getting products when database is empty"""
+    def _remember_seeded(self, count):
+        """Record (or, for count 0, forget) that the target DB holds products"""
         try:
-            response = requests.get(f"{self.base_url}/products", timeout=10)
-            success = response.status_code == 200
-            if success:
-                products = response.json()
-                self.log_test("Get Products (Empty DB)", success, f"Found {len(products)} products")
-                return len(products)
+            if count > 0:
+                with open(SEED_CACHE_PATH, "w") as f:
+                    json.dump({"base_url": self.base_url, "seeded_at": time.time(), "count": count}, f)
             else:
-                self.log_test("Get Products (Empty DB)", False, f"Status: {response.status_code}")
-                return -1
-        except Exception as e:
-            self.log_test("Get Products (Empty DB)", False, str(e))
-            return -1
+                SEED_CACHE_PATH.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"⚠️  Could not update {SEED_CACHE_PATH}: {e}")
 
-    def test_seed_products(self):
-        """Test seeding database with sample products"""
-        try:
-            response = requests.get(f"{self.base_url}/seed-products", timeout=60)
-            success = response.status_code == 200
+    async def log_test(self, name, success, details=""):
+        """Log test result"""
+        async with self._lock:
+            self._counts['run'] += 1
             if success:
-                data = response.json()
-                inserted = data.get('inserted', 0)
-                failed = data.get('failed', 0)
-                self.log_test("Seed Products", success, f"Inserted: {inserted}, Failed: {failed}")
-                return inserted > 0
+                self._counts['passed'] += 1
+                self.passed_tests.append(name)
+                logger.info(f"✅ {name} - PASSED")
             else:
-                self.log_test("Seed Products", False, f"Status: {response.status_code}")
-                return False
-        except Exception as e:
-            self.log_test("Seed Products", False, str(e))
-            return False
+                self.failed_tests.append({"test": name, "details": details})
+                logger.error(f"❌ {name} - FAILED: {details}")
 
-    def test_get_products_after_seed(self):
-        """Test getting products after seeding"""
+    async def _request(self, method, path, retry=True, **kwargs):
+        """Send a request on the shared client.
+        
+        Pass retry=False for writes that must not be repeated.
+        """
+        send = self._request_with_retry if retry else self.client.request
+        return await send(method, path, **kwargs)
+
+    # Retry network errors, timeouts and 5xx with jittered exponential
+    # backoff; the last response (or exception) is returned as-is
+    @retry(
+        stop=stop_after_attempt(4),
+        wait=wait_exponential_jitter(initial=0.5, max=8),
+        retry=(retry_if_exception_type((httpx.NetworkError, httpx.TimeoutException))
+               | retry_if_result(lambda response: response.status_code >= 500)),
+        retry_error_callback=lambda state: state.outcome.result(),
+    )
+    async def _request_with_retry(self, method, path, **kwargs):
+        return await self.client.request(method, path, **kwargs)
+
+    async def _cached_get(self, path, params=None, ttl=30, **kwargs):
+        """GET a JSON resource, reusing a successful response for `ttl` seconds.
+        
+        Returns (status, body); only 200 responses are cached.
+        """
+        key = (path, frozenset((params or {}).items()))
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return 200, cached[1]
+        response = await self._request("GET", path, params=params, **kwargs)
+        if response.status_code != 200:
+            return response.status_code, None
+        body = response.json()
+        self._cache[key] = (time.monotonic(), body)
+        return 200, body
+
+    @staticmethod
+    def _decode(response):
+        """Return (status, body), parsing JSON bodies and keeping others as text"""
+        is_json = response.headers.get("content-type", "").startswith("application/json")
+        return response.status_code, response.json() if is_json else response.text
+
+    async def _send(self, name):
+        """Send the TESTS request for `name`; returns (status, body)"""
+        method, path, kwargs = TESTS[name]
+        if name in STREAMED_TESTS:
+            return await self._read_progress(method, path, **kwargs)
+        if method == "GET" and path in CACHED_PATHS:
+            return await self._cached_get(path, **kwargs)
+        return self._decode(await self._request(method, path, retry=name not in WRITE_TESTS, **kwargs))
+
+    async def _read_progress(self, method, path, **kwargs):
+        """Read an NDJSON progress stream until the first product is seeded.
+        
+        Returns (status, last update) so the test can pass early; the rest
+        of the stream is drained in self._seed_drain, which resolves to the
+        final summary. Non-NDJSON replies are decoded as usual.
+        """
+        request = self.client.build_request(method, path, **kwargs)
+        response = await self.client.send(request, stream=True)
         try:
-            response = requests.get(f"{self.base_url}/products", timeout=10)
-            success = response.status_code == 200
-            if success:
-                products = response.json()
-                count = len(products)
-                self.log_test("Get Products (After Seed)", success, f"Found {count} products")
-                return products if count > 0 else []
-            else:
-                self.log_test("Get Products (After Seed)", False, f"Status: {response.status_code}")
-                return []
-        except Exception as e:
-            self.log_test("Get Products (After Seed)", False, str(e))
-            return []
+            if not response.headers.get("content-type", "").startswith("application/x-ndjson"):
+                await response.aread()
+                return self._decode(response)
+            lines = response.aiter_lines()
+            update = {}
+            async for line in lines:
+                if not line:
+                    continue
+                update = json.loads(line)
+                if update.get("seeded", 0) > 0 or "inserted" in update or "error" in update:
+                    break
+        except BaseException:
+            await response.aclose()
+            raise
+        if "seeded" in update:
+            self._seed_drain = asyncio.create_task(self._drain_progress(response, lines, update))
+        else:
+            await response.aclose()
+        return response.status_code, update
 
-    def test_get_categories(self):
-        """Test getting product categories"""
+    async def _drain_progress(self, response, lines, update):
+        """Read the remaining progress lines and return the last one"""
         try:
-            response = requests.get(f"{self.base_url}/products/categories", timeout=10)
-            success = response.status_code == 200
-            if success:
-                data = response.json()
-                categories = data.get('categories', [])
-                self.log_test("Get Categories", success, f"Found categories: {categories}")
-                return categories
-            else:
-                self.log_test("Get Categories", False, f"Status: {response.status_code}")
-                return []
-        except Exception as e:
-            self.log_test("Get Categories", False, str(e))
-            return []
+            async for line in lines:
+                if line:
+                    update = json.loads(line)
+            return update
+        finally:
+            await response.aclose()
 
-    def test_search_by_url(self):
-        """Test search by image URL"""
+    async def _wait_for_seeding(self):
+        """Wait for a streamed seed to finish before tests that read the DB"""
+        if self._seed_drain is None:
+            return
         try:
-            # Use a simple test image URL
-            test_url = "https://images.unsplash.com/photo-1542291026-7eec264c27ff?w=500"
-            
-            data = {
-                'url': test_url,
-                'limit': 5,
-                'min_similarity': 0.3
-            }
-            
-            response = requests.post(f"{self.base_url}/search/url", data=data, timeout=30)
-            success = response.status_code == 200
-            if success:
-                results = response.json()
-                self.log_test("Search by URL", success, f"Found {len(results)} similar products")
-                return len(results) > 0
-            else:
-                self.log_test("Search by URL", False, f"Status: {response.status_code}, Response: {response.text}")
-                return False
+            summary = await self._seed_drain
         except Exception as e:
-            self.log_test("Search by URL", False, str(e))
-            return False
+            logger.warning(f"⚠️  Lost the seeding progress stream: {e}")
+            return
+        finally:
+            self._seed_drain = None
+        if "error" in summary:
+            logger.warning(f"⚠️  Seeding stopped early: {summary['error']}")
+        else:
+            logger.info(f"🌱 Seeding finished - Inserted: {summary.get('inserted', 0)}, "
+                        f"Failed: {summary.get('failed', 0)}")
 
-    def test_search_by_upload(self):
-        """Test search by file upload"""
+    async def _batch(self, names):
+        """Send the TESTS requests for `names` in one POST to /batch.
+        
+        Returns one (status, body) per name. Falls back to concurrent
+        requests when the backend has no /batch endpoint; there a failed
+        request is returned as its exception so the other ops still count.
+        """
+        ops = []
+        for name in names:
+            method, path, kwargs = TESTS[name]
+            ops.append({"method": method, "path": path, **kwargs})
+        # A batch holding a write is sent once, like the write itself
+        retry = not WRITE_TESTS.intersection(names)
+        response = await self._request("POST", "/batch", retry=retry, json={"ops": ops}, timeout=60)
+        if response.status_code == 200:
+            return [(result["status"], result["body"]) for result in response.json()["results"]]
+        if response.status_code not in (404, 405):
+            response.raise_for_status()
+        return await asyncio.gather(*(self._send(name) for name in names), return_exceptions=True)
+
+    async def _run_batched(self, checks):
+        """Dispatch (name, check) pairs in one batch and hand each result to its check"""
+        start = time.perf_counter()
         try:
-            # Create a simple test image (1x1 pixel PNG)
-            import io
-            from PIL import Image
-            
-            # Create a small test image
-            img = Image.new('RGB', (100, 100), color='red')
-            img_bytes = io.BytesIO()
-            img.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
-            
-            files = {'file': ('test.png', img_bytes, 'image/png')}
-            data = {
-                'limit': 5,
-                'min_similarity': 0.1  # Lower threshold for test
-            }
-            
-            response = requests.post(f"{self.base_url}/search/upload", files=files, data=data, timeout=30)
-            success = response.status_code == 200
-            if success:
-                results = response.json()
-                self.log_test("Search by Upload", success, f"Found {len(results)} similar products")
-                return len(results) >= 0  # Accept 0 results as valid
-            else:
-                self.log_test("Search by Upload", False, f"Status: {response.status_code}, Response: {response.text}")
-                return False
+            results = await self._batch([name for name, _ in checks])
         except Exception as e:
-            self.log_test("Search by Upload", False, str(e))
-            return False
+            results = [e] * len(checks)
+        elapsed = time.perf_counter() - start
+        for (name, check), result in zip(checks, results):
+            await check(result)
+            # The check only times itself; each batched test also waited on the round trip
+            self.timings[name] += elapsed
+
+    def _invalidate(self, path):
+        """Drop cached responses for a path after a write"""
+        for key in [key for key in self._cache if key[0] == path]:
+            del self._cache[key]
+
+    @test_case("API Health Check", default=False)
+    async def test_api_health(self, status, body):
+        """Test basic API health"""
+        expect_ok(status, body)
+        clip_available = body.get('clip_available', False)
+        return clip_available, f"CLIP Available: {clip_available}"
+
+    @test_case("Get Products (Empty DB)", default=-1)
+    async def test_get_products_empty(self, status, products):
+        """Test getting products when database is empty"""
+        expect_ok(status, products)
+        return len(products), f"Found {len(products)} products"
+
+    @test_case("Seed Products", default=False)
+    async def test_seed_products(self, status, data):
+        """Test seeding database with sample products"""
+        self._invalidate("/products")
+        self._invalidate("/products/categories")
+        expect_ok(status, data)
+        if "error" in data:
+            raise AssertionError(data["error"])
+        if "seeded" in data:
+            return True, f"Seeded: {data['seeded']} (waiting for the rest)"
+        inserted = data.get('inserted', 0)
+        failed = data.get('failed', 0)
+        return inserted > 0, f"Inserted: {inserted}, Failed: {failed}"
+
+    @test_case("Get Products (After Seed)", default=[])
+    async def test_get_products_after_seed(self, status, products):
+        """Test getting products after seeding"""
+        expect_ok(status, products)
+        count = len(products)
+        self._remember_seeded(count)
+        return products if count > 0 else [], f"Found {count} products"
+
+    @test_case("Get Categories", default=[])
+    async def test_get_categories(self, status, data):
+        """Test getting product categories"""
+        expect_ok(status, data)
+        categories = data.get('categories', [])
+        return categories, f"Found categories: {categories}"
+
+    @test_case("Search by URL", default=False)
+    async def test_search_by_url(self, status, results):
+        """Test search by image URL"""
+        expect_ok(status, results)
+        return len(results) > 0, f"Found {len(results)} similar products"
 
-    def test_create_product(self):
+    @test_case("Search by Upload", default=False)
+    async def test_search_by_upload(self, status, results):
+        """Test search by file upload"""
+        expect_ok(status, results)
+        return len(results) >= 0, f"Found {len(results)} similar products"  # Accept 0 results as valid
+
+    @test_case("Create Product")
+    async def test_create_product(self, status, product):
         """Test creating a new product"""
-        try:
-            product_data = {
-                "name": "Test Product",
-                "category": "Test",
-                "image_url": "https://images.unsplash.com/photo-1542291026-7eec264c27ff?w=500",
-                "price": 99.99,
-                "description": "Test product for API testing"
-            }
-            
-            response = requests.post(f"{self.base_url}/products", json=product_data, timeout=30)
-            success = response.status_code == 200
-            if success:
-                product = response.json()
-                self.log_test("Create Product", success, f"Created product: {product.get('name')}")
-                return product.get('id')
-            else:
-                self.log_test("Create Product", False, f"Status: {response.status_code}, Response: {response.text}")
-                return None
-        except Exception as e:
-            self.log_test("Create Product", False, str(e))
-            return None
+        self._invalidate("/products")
+        expect_ok(status, product)
+        return product.get('id'), f"Created product: {product.get('name')}"
 
-    def run_all_tests(self):
+    async def run_all_tests(self):
         """Run all backend tests"""
-        print("🚀 Starting Visual Product Matcher Backend Tests")
-        print("=" * 60)
+        logger.info("🚀 Starting Visual Product Matcher Backend Tests")
+        logger.info("=" * 60)
         
-        # Test 1: API Health
-        clip_available = self.test_api_health()
-        if not clip_available:
-            print("⚠️  CLIP model not available - some tests may fail")
+        try:
+            return await self._run_tests()
+        finally:
+            await self.client.aclose()
+
+    async def _run_seeded_tests(self, clip_available, seeding):
+        """Run the listing and searches once seeding has finished"""
+        # The listing (and the seed cache it updates) and the searches need
+        # the fully seeded DB
+        await self._wait_for_seeding()
+        products = await self.test_get_products_after_seed()
         
-        # Test 2: Get products (empty)
-        initial_count = self.test_get_products_empty()
+        # JSON and form sub-requests share one /batch round trip; the
+        # multipart upload is sent on its own
+        batched = []
+        if clip_available and not seeding:
+            batched.append(("Create Product", self.test_create_product))
+        searches = []
+        if clip_available and len(products) > 0:
+            batched.append(("Search by URL", self.test_search_by_url))
+            searches.append(self.test_search_by_upload())
+        if batched:
+            searches.append(self._run_batched(batched))
+        for result in await asyncio.gather(*searches, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️  Unexpected error in concurrent test: {result}")
+
+    async def _run_tests(self):
+        # Tests 1-2: API health and product count are independent, so
+        # fetch them together and pay one round trip for the preamble.
+        # A fresh seed cache means the DB is known to hold products.
+        if self._skip_seed:
+            logger.info(f"⏭️  {SEED_CACHE_PATH} shows a seeded DB - skipping empty check and seeding")
+            clip_available, initial_count = await self.test_api_health(), None
+        else:
+            clip_available, initial_count = await asyncio.gather(
+                self.test_api_health(), self.test_get_products_empty()
+            )
+        if not clip_available:
+            logger.warning("⚠️  CLIP model not available - some tests may fail")
         
         # Test 3: Seed products (if needed)
         if initial_count == 0:
-            seed_success = self.test_seed_products()
+            seed_success = await self.test_seed_products()
             if not seed_success:
-                print("❌ Seeding failed - skipping dependent tests")
+                logger.error("❌ Seeding failed - skipping dependent tests")
                 return self.get_results()
         
-        # Test 4: Get products after seeding
-        products = self.test_get_products_after_seed()
-        
-        # Test 5: Get categories
-        categories = self.test_get_categories()
-        
-        # Test 6: Create new product
-        if clip_available:
-            new_product_id = self.test_create_product()
-        
-        # Test 7: Search by URL
-        if clip_available and len(products) > 0:
-            self.test_search_by_url()
-        
-        # Test 8: Search by upload
-        if clip_available and len(products) > 0:
-            self.test_search_by_upload()
+        # Tests 4-8 run concurrently. return_exceptions keeps one failure
+        # from cancelling its siblings.
+        seeding = self._seed_drain is not None
+        independent = [self.test_get_categories(), self._run_seeded_tests(clip_available, seeding)]
+        # Creating a product doesn't read the catalogue, so it goes out while
+        # the seed stream drains; otherwise it shares the searches' batch
+        if clip_available and seeding:
+            independent.append(self.test_create_product())
+        for result in await asyncio.gather(*independent, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️  Unexpected error in concurrent test: {result}")
         
         return self.get_results()
 
     def get_results(self):
         """Get test results summary"""
-        print("\n" + "=" * 60)
-        print(f"📊 Test Results: {self.tests_passed}/{self.tests_run} passed")
+        tests_run, tests_passed = self._counts['run'], self._counts['passed']
+        # Build the summary, then write it in one go
+        lines = ["", "=" * 60, f"📊 Test Results: {tests_passed}/{tests_run} passed"]
         
         if self.failed_tests:
-            print("\n❌ Failed Tests:")
-            for test in self.failed_tests:
-                print(f"  - {test['test']}: {test['details']}")
+            lines.append("\n❌ Failed Tests:")
+            lines.extend(f"  - {test['test']}: {test['details']}" for test in self.failed_tests)
         
         if self.passed_tests:
-            print(f"\n✅ Passed Tests: {', '.join(self.passed_tests)}")
+            lines.append(f"\n✅ Passed Tests: {', '.join(self.passed_tests)}")
+        
+        if self.timings:
+            lines.append("\n⏱️  Timings:")
+            lines.extend(f"  - {name}: {elapsed:.2f}s"
+                         for name, elapsed in sorted(self.timings.items(), key=lambda item: -item[1]))
         
-        success_rate = (self.tests_passed / self.tests_run * 100) if self.tests_run > 0 else 0
-        print(f"\n📈 Success Rate: {success_rate:.1f}%")
+        success_rate = (tests_passed / tests_run * 100) if tests_run > 0 else 0
+        lines.append(f"\n📈 Success Rate: {success_rate:.1f}%")
+        logger.info("\n".join(lines))
         
         return {
-            "total_tests": self.tests_run,
-            "passed_tests": self.tests_passed,
+            "total_tests": tests_run,
+            "passed_tests": tests_passed,
             "failed_tests": len(self.failed_tests),
             "success_rate": success_rate,
-            "passed_test_names": self.passed_tests,
-            "failed_test_details": self.failed_tests
+            "passed_test_names": list(self.passed_tests),
+            "failed_test_details": list(self.failed_tests),
+            "timings": self.timings
         }
 
 def main():
     """Main test execution"""
+    install_dns_cache()
     tester = VisualProductMatcherTester()
-    results = tester.run_all_tests()
+    results = asyncio.run(tester.run_all_tests())
     
     # Return appropriate exit code
     return 0 if results["failed_tests"] == 0 else 1
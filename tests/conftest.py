@@ -0,0 +1,69 @@
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+import server  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs if length is None else self.docs[:length]
+
+
+class FakeCollection:
+    """The subset of a Motor collection the server uses, held in memory."""
+    def __init__(self):
+        self.docs = []
+
+    @staticmethod
+    def _matches(doc, query):
+        for field, condition in query.items():
+            if isinstance(condition, dict) and "$exists" in condition:
+                if (field in doc) != condition["$exists"]:
+                    return False
+            elif doc.get(field) != condition:
+                return False
+        return True
+
+    @staticmethod
+    def _project(doc, projection):
+        fields = {field: keep for field, keep in (projection or {}).items() if field != "_id"}
+        if any(fields.values()):
+            return {field: doc[field] for field in fields if field in doc}
+        return {field: value for field, value in doc.items() if field not in fields and field != "_id"}
+
+    def find(self, query=None, projection=None):
+        return FakeCursor([copy.deepcopy(self._project(doc, projection))
+                           for doc in self.docs if self._matches(doc, query or {})])
+
+    async def insert_one(self, doc):
+        self.docs.append(copy.deepcopy(doc))
+
+    async def count_documents(self, query):
+        return sum(self._matches(doc, query) for doc in self.docs)
+
+    async def distinct(self, field):
+        return list(dict.fromkeys(doc[field] for doc in self.docs if field in doc))
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.products = FakeCollection()
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Swap the MongoDB handle for an in-memory one and unload the corpus."""
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+    # Restore whatever a load into the fake database replaces
+    for name in ("EMB_INDEX", "EMB_BITS", "EMB_META", "EMB_CATEGORIES", "EMB_SCORES", "EMB_IDS"):
+        monkeypatch.setattr(server, name, getattr(server, name))
+    monkeypatch.setattr(server, "EMB_MATRIX", None)
+    return database
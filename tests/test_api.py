@@ -0,0 +1,97 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+import server  # noqa: E402
+
+
+def get(path, **kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api") as client:
+            return await client.get(path, **kwargs)
+    return asyncio.run(send())
+
+
+def store_products(db, count):
+    rng = np.random.default_rng(5)
+    for i in range(count):
+        product = server.Product(id=f"p{i}", name=f"Product {i}", category="Shoes",
+                                 image_url=f"http://img/{i}", price=10.0 + i)
+        db.products.docs.append(server.product_document(product, rng.standard_normal(server.EMBEDDING_DIM)))
+
+
+def test_get_products_projects_fields(fake_db):
+    store_products(fake_db, 3)
+    response = get("/products", params={"fields": "id, name"})
+    assert response.status_code == 200
+    assert response.json() == [{"id": f"p{i}", "name": f"Product {i}"} for i in range(3)]
+
+
+def test_get_products_without_fields_returns_full_products(fake_db):
+    store_products(fake_db, 2)
+    response = get("/products")
+    assert response.status_code == 200
+    products = response.json()
+    assert [p["id"] for p in products] == ["p0", "p1"]
+    assert len(products[0]["embedding"]) == server.EMBEDDING_DIM
+    assert "embedding_i8" not in products[0]
+
+
+@pytest.mark.parametrize("fields", ["embedding", "id,embedding_i8", " , "])
+def test_get_products_rejects_unknown_fields(fake_db, fields):
+    assert get("/products", params={"fields": fields}).status_code == 400
+
+
+class FakeEmbedder:
+    async def embed_batch(self, images):
+        return np.ones((len(images), server.EMBEDDING_DIM), dtype=np.float32) / np.sqrt(server.EMBEDDING_DIM)
+
+
+@pytest.fixture
+def fake_seeding(fake_db, monkeypatch):
+    """Seed with a fake embedder; one image download in every ten fails."""
+    async def load_image_from_url(url):
+        if sum(map(ord, url)) % 10 == 0:
+            raise ValueError(f"Failed to load image from URL: {url}")
+        return object()
+
+    monkeypatch.setattr(server, "embedder", FakeEmbedder())
+    monkeypatch.setattr(server, "load_image_from_url", load_image_from_url)
+    return fake_db
+
+
+def stream_lines(path, **kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api") as client:
+            async with client.stream("GET", path, **kwargs) as response:
+                return response, [line async for line in response.aiter_lines() if line]
+    return asyncio.run(send())
+
+
+def test_seed_products_streams_ndjson_progress(fake_seeding):
+    response, lines = stream_lines("/seed-products", params={"stream": "true"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    updates = [json.loads(line) for line in lines]
+    *progress, summary = updates
+    inserted = len(fake_seeding.products.docs)
+    assert inserted > 0
+    assert progress == [{"seeded": k} for k in range(1, inserted + 1)]
+    assert summary["inserted"] == inserted
+    assert summary["inserted"] + summary["failed"] > inserted
+
+
+def test_seed_products_without_stream_returns_summary(fake_seeding):
+    response = get("/seed-products")
+    assert response.status_code == 200
+    assert response.json()["inserted"] == len(fake_seeding.products.docs)
+    # A seeded database is left alone
+    assert get("/seed-products", params={"stream": "true"}).json()["message"].startswith("Database already contains")
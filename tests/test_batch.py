@@ -0,0 +1,46 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+import server  # noqa: E402
+
+
+def post_batch(ops):
+    async def send():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api") as client:
+            return await client.post("/batch", json={"ops": ops})
+    return asyncio.run(send())
+
+
+@pytest.fixture
+def no_embedder(monkeypatch):
+    # Batched searches answer 503 instead of downloading images
+    monkeypatch.setattr(server, "embedder", None)
+
+
+def test_batch_dispatches_allowed_ops(no_embedder):
+    response = post_batch([{"method": "POST", "path": "/search/url", "data": {"url": "http://x"}}] * 2)
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == [503, 503]
+
+
+def test_batch_rejects_too_many_ops(no_embedder):
+    op = {"method": "POST", "path": "/search/url", "data": {"url": "http://x"}}
+    assert post_batch([op] * (server.MAX_BATCH_OPS + 1)).status_code == 400
+
+
+@pytest.mark.parametrize("op", [
+    {"method": "POST", "path": "/batch", "json": {"ops": []}},
+    {"method": "POST", "path": "/batch?x=1", "json": {"ops": []}},
+    {"method": "POST", "path": "/%62atch", "json": {"ops": []}},
+    {"method": "GET", "path": "/seed-products"},
+    {"method": "POST", "path": "//evil/products"},
+    {"method": "GET", "path": "/products"},
+])
+def test_batch_rejects_ops_outside_allowlist(no_embedder, op):
+    assert post_batch([op]).status_code == 400
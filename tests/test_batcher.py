@@ -0,0 +1,97 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+import server  # noqa: E402
+
+
+class FakeEmbedder:
+    """Records each batch and embeds image i as a vector filled with i."""
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    async def embed_batch(self, images):
+        self.batches.append(list(images))
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return np.array([np.full(4, image, dtype=np.float32) for image in images])
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_submits_share_one_forward_pass():
+    embedder = FakeEmbedder()
+
+    async def main():
+        batcher = server.EmbeddingBatcher(embedder, max_batch=8, max_wait=0.05)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        finally:
+            await batcher.stop()
+
+    results = run(main())
+    assert embedder.batches == [[0, 1, 2, 3, 4]]
+    for i, embedding in enumerate(results):
+        np.testing.assert_array_equal(embedding, np.full(4, i))
+
+
+def test_batches_split_at_max_batch():
+    embedder = FakeEmbedder()
+
+    async def main():
+        batcher = server.EmbeddingBatcher(embedder, max_batch=2, max_wait=0.05)
+        try:
+            await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        finally:
+            await batcher.stop()
+
+    run(main())
+    assert embedder.batches == [[0, 1], [2, 3], [4]]
+
+
+def test_error_reaches_every_waiter():
+    embedder = FakeEmbedder(error=RuntimeError("out of memory"))
+
+    async def main():
+        batcher = server.EmbeddingBatcher(embedder, max_batch=8, max_wait=0.05)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    results = run(main())
+    assert len(embedder.batches) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_cancelled_waiter_does_not_break_loop():
+    embedder = FakeEmbedder()
+
+    async def main():
+        batcher = server.EmbeddingBatcher(embedder, max_batch=8, max_wait=0.05)
+        try:
+            cancelled = asyncio.create_task(batcher.submit(0))
+            kept = asyncio.create_task(batcher.submit(1))
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await cancelled
+            first = await kept
+            # The loop keeps serving later requests
+            second = await batcher.submit(2)
+            return first, second
+        finally:
+            await batcher.stop()
+
+    first, second = run(main())
+    np.testing.assert_array_equal(first, np.full(4, 1))
+    np.testing.assert_array_equal(second, np.full(4, 2))
+    assert embedder.batches == [[0, 1], [2]]
@@ -0,0 +1,113 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+import server  # noqa: E402
+
+
+def normalize(vectors):
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def make_product(i, embedding, category="Shoes"):
+    product = server.Product(id=f"p{i}", name=f"Product {i}", category=category, image_url=f"http://img/{i}")
+    return server.product_document(product, embedding)
+
+
+@pytest.fixture
+def empty_corpus(monkeypatch):
+    """Install an empty, loaded corpus."""
+    matrix = np.empty((0, server.EMBEDDING_DIM), dtype=np.int8)
+    monkeypatch.setattr(server, "EMB_MATRIX", matrix)
+    monkeypatch.setattr(server, "EMB_INDEX", server.build_ann_index(matrix) if server.USEARCH_AVAILABLE else None)
+    monkeypatch.setattr(server, "EMB_BITS", server.binarize_embeddings(matrix))
+    monkeypatch.setattr(server, "EMB_META", [])
+    monkeypatch.setattr(server, "EMB_CATEGORIES", np.empty(0, dtype=object))
+    monkeypatch.setattr(server, "EMB_SCORES", np.empty(0, dtype=np.float32))
+    monkeypatch.setattr(server, "EMB_IDS", set())
+    return np.random.default_rng(2)
+
+
+def test_add_to_embedding_corpus_keeps_buffers_in_step(empty_corpus):
+    rng = empty_corpus
+    embeddings = normalize(rng.standard_normal((3, server.EMBEDDING_DIM))).astype(np.float32)
+    docs = [make_product(i, e, category) for i, (e, category) in enumerate(zip(embeddings, ["Shoes", "Books", "Shoes"]))]
+
+    async def add():
+        for doc in docs:
+            await server.add_to_embedding_corpus(doc)
+        # A product already in the corpus is not added twice
+        await server.add_to_embedding_corpus(docs[0])
+
+    asyncio.run(add())
+    assert server.EMB_MATRIX.shape == (3, server.EMBEDDING_DIM)
+    np.testing.assert_array_equal(server.EMB_MATRIX, np.stack([server.quantize_embedding(e) for e in embeddings]))
+    np.testing.assert_array_equal(server.EMB_BITS, server.binarize_embeddings(server.EMB_MATRIX))
+    assert len(server.EMB_SCORES) == len(server.EMB_META) == len(server.EMB_CATEGORIES) == 3
+    assert list(server.EMB_CATEGORIES) == ["Shoes", "Books", "Shoes"]
+    assert [m["id"] for m in server.EMB_META] == ["p0", "p1", "p2"]
+    assert server.EMB_IDS == {"p0", "p1", "p2"}
+
+    results = asyncio.run(server.rank_products(embeddings[1], limit=1, min_similarity=0.5))
+    assert [r["id"] for r in results] == ["p1"]
+
+
+def test_add_to_embedding_corpus_before_load_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(server, "EMB_MATRIX", None)
+    monkeypatch.setattr(server, "EMB_META", [])
+    embedding = normalize(np.ones(server.EMBEDDING_DIM, dtype=np.float32))
+    asyncio.run(server.add_to_embedding_corpus(make_product(0, embedding)))
+    assert server.EMB_MATRIX is None and server.EMB_META == []
+
+
+def test_add_to_embedding_corpus_extends_ann_index(empty_corpus):
+    if not server.USEARCH_AVAILABLE:
+        pytest.skip("usearch not installed")
+    rng = empty_corpus
+    embeddings = normalize(rng.standard_normal((50, server.EMBEDDING_DIM))).astype(np.float32)
+
+    async def add():
+        for i, embedding in enumerate(embeddings):
+            await server.add_to_embedding_corpus(make_product(i, embedding))
+
+    asyncio.run(add())
+    # Index keys are row numbers in EMB_MATRIX
+    assert len(server.EMB_INDEX) == len(server.EMB_MATRIX) == 50
+    for row in (0, 25, 49):
+        keys = server.EMB_INDEX.search(server.quantize_embedding(embeddings[row]), 1).keys
+        assert int(keys[0]) == row
+    # A limit of 1 shortlists through the index
+    results = asyncio.run(server.rank_products(embeddings[25], limit=1, min_similarity=0.5))
+    assert [r["id"] for r in results] == ["p25"]
+
+
+def test_product_document_round_trips_embedding_bytes():
+    embedding = normalize(np.random.default_rng(3).standard_normal(server.EMBEDDING_DIM)).astype(np.float32)
+    doc = make_product(0, embedding)
+    assert isinstance(doc["embedding"], bytes)
+    assert len(doc["embedding"]) == server.EMBEDDING_DIM * 4
+    np.testing.assert_array_equal(np.frombuffer(doc["embedding_i8"], dtype=np.int8), server.quantize_embedding(embedding))
+    product = server.Product(**doc)
+    np.testing.assert_array_equal(np.asarray(product.embedding, dtype=np.float32), embedding)
+
+
+def test_load_embedding_corpus_reads_legacy_float_lists(fake_db):
+    rng = np.random.default_rng(4)
+    embeddings = normalize(rng.standard_normal((3, server.EMBEDDING_DIM))).astype(np.float32)
+    fake_db.products.docs = [
+        make_product(0, embeddings[0]),
+        # Stored before int8 quantization, with a plain float list
+        {"id": "p1", "name": "Product 1", "category": "Books", "image_url": "http://img/1",
+         "embedding": embeddings[1].tolist()},
+        {"id": "p2", "name": "Product 2", "category": "Books", "image_url": "http://img/2", "embedding": []},
+    ]
+
+    asyncio.run(server.load_embedding_corpus())
+    assert [m["id"] for m in server.EMB_META] == ["p0", "p1"]
+    np.testing.assert_array_equal(server.EMB_MATRIX, np.stack([server.quantize_embedding(e) for e in embeddings[:2]]))
+    assert server.EMB_IDS == {"p0", "p1"}
+    assert list(server.EMB_CATEGORIES) == ["Shoes", "Books"]
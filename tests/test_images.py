@@ -0,0 +1,37 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+import server  # noqa: E402
+
+
+def encode(size, fmt, mode="RGB"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color=128).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG"])
+@pytest.mark.parametrize("size", [(2000, 1000), (900, 1600)])
+def test_decode_image_downscales_large_images(fmt, size):
+    image = server.decode_image(encode(size, fmt))
+    assert image.mode == "RGB"
+    # Never below the CLIP crop, never much above the preprocessing short side
+    assert server.CLIP_IMAGE_SIZE <= min(image.size) <= server.PREPROCESS_SHORT_SIDE
+    assert image.width / image.height == pytest.approx(size[0] / size[1], rel=0.02)
+
+
+def test_decode_image_keeps_small_images():
+    image = server.decode_image(encode((120, 90), "PNG"))
+    assert image.size == (120, 90)
+
+
+@pytest.mark.parametrize("mode", ["L", "RGBA", "P"])
+def test_decode_image_converts_to_rgb(mode):
+    image = server.decode_image(encode((600, 400), "PNG", mode=mode))
+    assert image.mode == "RGB"
+    assert image.size == (384, 256)
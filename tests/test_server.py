@@ -0,0 +1,103 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+import server  # noqa: E402
+
+CATEGORIES = ("Shoes", "Chairs", "Books")
+
+
+def normalize(vectors):
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+@pytest.fixture
+def corpus(monkeypatch):
+    """Install a synthetic corpus of 200 normalized embeddings."""
+    rng = np.random.default_rng(0)
+    embeddings = normalize(rng.standard_normal((200, server.EMBEDDING_DIM))).astype(np.float32)
+    categories = [CATEGORIES[i % len(CATEGORIES)] for i in range(len(embeddings))]
+    matrix = np.stack([server.quantize_embedding(e) for e in embeddings])
+    meta = [{"id": str(i), "name": f"Product {i}", "category": c, "image_url": "", "price": None,
+             "description": None} for i, c in enumerate(categories)]
+
+    monkeypatch.setattr(server, "EMB_MATRIX", matrix)
+    monkeypatch.setattr(server, "EMB_INDEX", server.build_ann_index(matrix) if server.USEARCH_AVAILABLE else None)
+    monkeypatch.setattr(server, "EMB_BITS", server.binarize_embeddings(matrix))
+    monkeypatch.setattr(server, "EMB_META", meta)
+    monkeypatch.setattr(server, "EMB_CATEGORIES", np.array(categories, dtype=object))
+    monkeypatch.setattr(server, "EMB_SCORES", np.empty(len(matrix), dtype=np.float32))
+    monkeypatch.setattr(server, "EMB_IDS", {m["id"] for m in meta})
+    return embeddings, np.array(categories, dtype=object), rng
+
+
+def rank(query, limit, min_similarity=-1.0, category=None):
+    return asyncio.run(server.rank_products(query.astype(np.float32), limit, min_similarity, category))
+
+
+def noisy_query(embeddings, row, rng):
+    return normalize(embeddings[row] + 0.3 * rng.standard_normal(server.EMBEDDING_DIM) / np.sqrt(server.EMBEDDING_DIM))
+
+
+@pytest.mark.parametrize("use_ann", [True, False])
+def test_rank_products_top1_matches_brute_force(corpus, monkeypatch, use_ann):
+    embeddings, _, rng = corpus
+    if not use_ann:
+        # Force the Hamming shortlist
+        monkeypatch.setattr(server, "EMB_INDEX", None)
+    for row in (0, 57, 123, 199):
+        query = noisy_query(embeddings, row, rng)
+        results = rank(query, limit=5)
+        assert len(results) == 5
+        assert results[0]["id"] == str(np.argmax(embeddings @ query))
+        scores = [r["similarity_score"] for r in results]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_rank_products_scores_match_float_similarity(corpus):
+    embeddings, _, rng = corpus
+    query = noisy_query(embeddings, 10, rng)
+    # A limit covering the corpus ranks every row exactly, without a shortlist
+    results = rank(query, limit=len(embeddings))
+    expected = embeddings @ query
+    assert [r["id"] for r in results[:3]] == [str(i) for i in np.argsort(-expected)[:3]]
+    for r in results:
+        assert r["similarity_score"] == pytest.approx(expected[int(r["id"])], abs=0.01)
+
+
+def test_rank_products_non_positive_limit(corpus):
+    embeddings, _, rng = corpus
+    query = noisy_query(embeddings, 0, rng)
+    assert rank(query, limit=0) == []
+    assert rank(query, limit=-3) == []
+
+
+def test_rank_products_unknown_category(corpus):
+    embeddings, _, rng = corpus
+    assert rank(noisy_query(embeddings, 0, rng), limit=5, category="Spaceships") == []
+
+
+def test_rank_products_category_filter(corpus):
+    embeddings, categories, rng = corpus
+    query = noisy_query(embeddings, 4, rng)
+    results = rank(query, limit=5, category="Chairs")
+    assert results and all(r["category"] == "Chairs" for r in results)
+    in_category = np.flatnonzero(categories == "Chairs")
+    assert results[0]["id"] == str(in_category[np.argmax(embeddings[in_category] @ query)])
+
+
+def test_rank_products_min_similarity_cutoff(corpus):
+    embeddings, _, rng = corpus
+    query = noisy_query(embeddings, 42, rng)
+    expected = embeddings @ query
+    threshold = 0.05
+    results = rank(query, limit=len(embeddings), min_similarity=threshold)
+    returned = {r["id"] for r in results}
+    assert all(r["similarity_score"] >= threshold for r in results)
+    # Quantization may move scores right at the cutoff, but not ones clear of it
+    assert {str(i) for i in np.flatnonzero(expected >= threshold + 0.01)} <= returned
+    assert not returned & {str(i) for i in np.flatnonzero(expected < threshold - 0.01)}
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+import server  # noqa: E402
+
+
+@pytest.fixture(params=["simsimd", "numba", "numpy"])
+def scoring_kernel(request, monkeypatch):
+    """Route similarity_scores through one kernel."""
+    if request.param == "simsimd":
+        if not server.SIMSIMD_AVAILABLE:
+            pytest.skip("simsimd not installed")
+        return
+    monkeypatch.setattr(server, "SIMSIMD_AVAILABLE", False)
+    kernel = None
+    if request.param == "numba":
+        pytest.importorskip("numba")
+        kernel = server.load_numba_kernel()
+    monkeypatch.setattr(server, "_int8_dot_scores", kernel)
+
+
+def test_similarity_scores_kernels_agree(scoring_kernel):
+    rng = np.random.default_rng(1)
+    matrix = rng.integers(-127, 128, size=(37, server.EMBEDDING_DIM), dtype=np.int8)
+    query = rng.integers(-127, 128, size=server.EMBEDDING_DIM, dtype=np.int8)
+    expected = (matrix.astype(np.int32) @ query.astype(np.int32)) / server.INT8_SCALE ** 2
+
+    np.testing.assert_allclose(server.similarity_scores(matrix, query), expected, rtol=1e-5, atol=1e-6)
+    out = np.empty(len(matrix), dtype=np.float32)
+    assert server.similarity_scores(matrix, query, out=out) is out
+    np.testing.assert_allclose(out, expected, rtol=1e-5, atol=1e-6)